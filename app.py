@@ -1,8 +1,24 @@
+import gc
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Single-row inference gains nothing from BLAS/OpenMP parallelism -- the
+# thread-pool dispatch alone dwarfs the arithmetic on a (1, 7) input.
+# Must be set before numpy/sklearn are imported to take effect.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+
 import streamlit as st
-import numpy as np
-import joblib
 from pathlib import Path
 
+# numpy and joblib are deliberately not imported at module top: deferring
+# them into the functions that need them (Python caches imports, so the
+# cost is paid once) shaves their import time off time-to-first-render.
+
 # ---------- PAGE CONFIG ----------
 st.set_page_config(
     page_title="AI Powered Adaptive Solar Energy Predictor",
@@ -11,152 +27,419 @@ st.set_page_config(
 )
 
 # ---------- CUSTOM CSS ----------
-st.markdown(
-    """
-    <style>
-    /* Main background */
-    .stApp {
-        background: radial-gradient(circle at top, #071c3b 0, #020617 55%, #000000 100%);
-        color: #e5e7eb;
-        font-family: 'Segoe UI', system-ui, -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-
-    /* Glassmorphism cards */
-    .glass-card {
-        background: rgba(15, 23, 42, 0.80);
-        border-radius: 18px;
-        padding: 1.5rem 1.8rem;
-        border: 1px solid rgba(148, 163, 184, 0.35);
-        box-shadow: 0 18px 45px rgba(15, 23, 42, 0.95);
-        backdrop-filter: blur(22px);
-    }
-
-    /* Hero title */
-    .hero-title {
-        font-size: 2.6rem;
-        font-weight: 800;
-        letter-spacing: 0.06em;
-        text-transform: uppercase;
-        background: linear-gradient(120deg, #38bdf8, #a855f7, #facc15);
-        -webkit-background-clip: text;
-        color: transparent;
-        margin-bottom: 0.4rem;
-    }
-
-    .hero-subtitle {
-        font-size: 0.98rem;
-        color: #cbd5f5;
-        max-width: 620px;
-    }
-
-    /* Section headings */
-    .section-title {
-        font-size: 1.1rem;
-        letter-spacing: 0.08em;
-        text-transform: uppercase;
-        color: #9ca3af;
-        margin-bottom: 0.4rem;
-    }
-
-    /* Input labels tweak */
-    label {
-        font-size: 0.9rem !important;
-        font-weight: 500 !important;
-        color: #e5e7eb !important;
-    }
-
-    /* Buttons */
-    .stButton>button {
-        width: 100%;
-        border-radius: 999px;
-        padding: 0.7rem 1rem;
-        font-weight: 600;
-        letter-spacing: 0.05em;
-        text-transform: uppercase;
-        border: 1px solid rgba(248, 250, 252, 0.15);
-        background: linear-gradient(135deg, #22c55e, #16a34a);
-        transition: all 0.16s ease-in-out;
-    }
-
-    .stButton>button:hover {
-        transform: translateY(-1px) scale(1.01);
-        box-shadow: 0 18px 40px rgba(34, 197, 94, 0.45);
-        border-color: rgba(248, 250, 252, 0.50);
-    }
-
-    /* Metric styling */
-    [data-testid="stMetric"] {
-        background: rgba(15,23,42,0.92);
-        padding: 1rem 1.2rem;
-        border-radius: 1rem;
-        border: 1px solid rgba(148, 163, 184, 0.5);
-    }
-
-    /* Footer text */
-    .footer-text {
-        font-size: 0.75rem;
-        color: #6b7280;
-        text-align: center;
-        margin-top: 2rem;
-    }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+@st.cache_data
+def _css() -> str:
+    """Read the app stylesheet once; reruns reuse the cached string."""
+    return Path("static/app.css").read_text()
+
+
+st.markdown(f"<style>{_css()}</style>", unsafe_allow_html=True)
 
 # ---------- MODEL LOADER ----------
+# Resolved once at module load; load_model then needs a single
+# os.path.isfile check with no Path object allocation per call.
+_MODEL_PATH = os.path.abspath("system_production_model.pkl")
+_ONNX_PATH = os.path.splitext(_MODEL_PATH)[0] + ".onnx"
+
+
+class _OnnxModel:
+    """Thin ``.predict`` adapter around an onnxruntime InferenceSession.
+
+    Single-row inference through the compiled ONNX graph skips sklearn's
+    Python-level dispatch and input validation entirely.
+    """
+
+    def __init__(self, path):
+        import onnxruntime as ort
+
+        so = ort.SessionOptions()
+        so.intra_op_num_threads = 1
+        so.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._sess = ort.InferenceSession(
+            str(path),
+            sess_options=so,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_name = self._sess.get_inputs()[0].name
+
+    def predict(self, X):
+        import numpy as np
+
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return self._sess.run(None, {self._input_name: X})[0].ravel()
+
+
+def _downcast_to_float32(model):
+    """Best-effort float32 quantization of the fitted estimator.
+
+    Halves the bytes fetched per coefficient on the predict path. Only
+    linear-model arrays (``coef_``/``intercept_``) are rewritable from
+    Python; tree internals are immutable Cython state and get their
+    float32 treatment through the ONNX export instead.
+    """
+    import numpy as np
+
+    est = model.steps[-1][1] if hasattr(model, "steps") else model
+    for sub in getattr(est, "estimators_", None) or [est]:
+        if hasattr(sub, "coef_"):
+            sub.coef_ = sub.coef_.astype(np.float32)
+            sub.intercept_ = np.float32(sub.intercept_)
+
+
 @st.cache_resource
-def load_model(model_path: str = "system_production_model.pkl"):
-    path = Path(model_path)
-    if not path.exists():
+def load_model():
+    import joblib
+    import numpy as np
+
+    # Runs only on a cache miss, i.e. cold start or after a hot-reload of
+    # this file replaced the cache entry; collect whatever the previous
+    # model instance left behind before allocating the new one.
+    gc.collect()
+
+    # Prefer the compiled ONNX graph when the exported artifact and
+    # onnxruntime are available (see export_onnx.py); fall back to the
+    # pickled sklearn estimator otherwise.
+    if os.path.isfile(_ONNX_PATH):
+        try:
+            return _OnnxModel(_ONNX_PATH)
+        except ImportError:
+            pass
+    if not os.path.isfile(_MODEL_PATH):
         raise FileNotFoundError(
-            f"Model file '{model_path}' not found. "
+            f"Model file '{os.path.basename(_MODEL_PATH)}' not found. "
             "Make sure it is in the same folder as app.py."
         )
-    model = joblib.load(path)
+    # The artifact ships lz4-compressed (see compress_model.py): on slow
+    # deploy disks the smaller read beats memory-mapping an uncompressed
+    # dump, and joblib cannot mmap compressed pickles anyway.
+    model = joblib.load(_MODEL_PATH)
+    try:
+        _downcast_to_float32(model)
+    except Exception:
+        pass
+    # Cap any thread pools already created before the env vars applied
+    # (threadpoolctl ships with scikit-learn).
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=1)
+    except ImportError:
+        pass
+    # Warmup: the first predict pays one-off costs (BLAS thread-pool
+    # spin-up, lazy Cython imports inside sklearn). Run it here so the
+    # cached resource is already warm before the first user click.
+    try:
+        model.predict(np.zeros((1, 7), dtype=np.float32))
+    except Exception:
+        pass
     return model
 
 
+def _fast_predict_fn(model):
+    """Return a predict callable that skips sklearn's per-call validation.
+
+    ``estimator.predict`` re-runs ``check_array`` (dtype, 2-D, NaN and
+    finiteness scans) on every call, which is redundant here: the feature
+    row is built by us and is already contiguous float32. Where the
+    estimator's internals are known we call them directly; anything else
+    falls back to the public ``predict``.
+    """
+    if hasattr(model, "steps"):
+        # Pipelines run transform steps we cannot safely elide.
+        return model.predict
+    if hasattr(model, "tree_"):
+        tree = model.tree_
+        return lambda X: tree.predict(X).ravel()
+    if type(model).__name__ in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        trees = [est.tree_ for est in model.estimators_]
+        inv_n = 1.0 / len(trees)
+
+        def predict(X):
+            out = trees[0].predict(X).ravel().copy()
+            for t in trees[1:]:
+                out += t.predict(X).ravel()
+            out *= inv_n
+            return out
+
+        return predict
+    if hasattr(model, "coef_"):
+        coef = model.coef_.ravel()
+        intercept = model.intercept_
+        return lambda X: X @ coef + intercept
+    return model.predict
+
+
+def _numba_predict_fn(model):
+    """JIT-compile tree traversal with numba, specialized for one row.
+
+    Exports every tree's node arrays (feature, threshold, children,
+    value) into flat concatenated buffers once, then traverses them in a
+    single nopython loop -- no Cython call per tree, no intermediate
+    (1,) arrays. Returns ``None`` when numba is missing or the estimator
+    is not a plain single-output tree/forest, in which case the caller
+    keeps the regular fast path.
+    """
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    import numpy as np
+
+    if hasattr(model, "tree_"):
+        trees, scale = [model.tree_], 1.0
+    elif type(model).__name__ in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        trees = [est.tree_ for est in model.estimators_]
+        scale = 1.0 / len(trees)
+    else:
+        return None
+    if any(t.value.shape[1:] != (1, 1) for t in trees):
+        return None
+
+    feature = np.concatenate([t.feature for t in trees]).astype(np.int64)
+    threshold = np.concatenate([t.threshold for t in trees]).astype(np.float32)
+    left = np.concatenate([t.children_left for t in trees]).astype(np.int64)
+    right = np.concatenate([t.children_right for t in trees]).astype(np.int64)
+    value = np.concatenate([t.value.ravel() for t in trees]).astype(np.float64)
+    offsets = np.cumsum([0] + [t.node_count for t in trees]).astype(np.int64)
+
+    @njit(cache=True)
+    def _sum_trees(x, feature, threshold, left, right, value, offsets):
+        total = 0.0
+        for i in range(offsets.shape[0] - 1):
+            base = offsets[i]
+            node = base
+            while left[node] >= 0:
+                if x[feature[node]] <= threshold[node]:
+                    node = base + left[node]
+                else:
+                    node = base + right[node]
+            total += value[node]
+        return total
+
+    def predict(X):
+        out = np.empty(X.shape[0])
+        for i in range(X.shape[0]):
+            out[i] = _sum_trees(
+                X[i], feature, threshold, left, right, value, offsets
+            ) * scale
+        return out
+
+    # Compile now, at startup, rather than on the first click.
+    predict(np.zeros((1, 7), dtype=np.float32))
+    return predict
+
+
+def _feature_buffer():
+    """Per-session (1, 7) row passed to ``model.predict`` on every click.
+
+    Held in ``st.session_state`` so concurrent sessions never share (and
+    race on) the same buffer. Reusing it avoids a fresh list-of-list ->
+    ndarray conversion per prediction; C-contiguous float32 matches both
+    the ONNX graph input and sklearn's internal tree dtype, so neither
+    backend has to cast or copy.
+    """
+    import numpy as np
+
+    if "_feat" not in st.session_state:
+        st.session_state["_feat"] = np.empty((1, 7), dtype=np.float32)
+    return st.session_state["_feat"]
+
+
+class _PredictBatcher:
+    """Funnel concurrent sessions' rows into one batched predict call.
+
+    Single-row predict cost is dominated by fixed per-call overhead, so
+    when several sessions click at once the worker drains up to
+    ``_MAX_BATCH`` pending rows and answers them all with a single
+    ``(B, 7)`` call, amortizing that overhead across B users. It only
+    lingers ``_LINGER`` seconds for stragglers once a second pending row
+    has proven there is concurrency; a solo prediction is served
+    immediately and pays just the queue hop.
+    """
+
+    _MAX_BATCH = 64
+    _LINGER = 0.005
+    # Generous ceiling on a single predict; if the worker ever dies the
+    # caller gets a TimeoutError instead of blocking forever.
+    _TIMEOUT = 5.0
+
+    # Queue sentinel telling the worker thread to exit.
+    _CLOSE = object()
+
+    def __init__(self, predict_fn):
+        self._predict_fn = predict_fn
+        self._queue = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def predict(self, row):
+        fut = Future()
+        # Copy: the caller's session buffer is reused on the next click.
+        self._queue.put((fut, row[0].copy()))
+        return fut.result(timeout=self._TIMEOUT)
+
+    def close(self):
+        """Stop the worker thread; rows already queued are still served.
+
+        Without this, dropping the batcher would strand a daemon thread
+        blocked on the queue whose bound ``self`` pins ``_predict_fn``
+        (and through it the model) forever.
+        """
+        self._queue.put(self._CLOSE)
+
+    def _worker(self):
+        import numpy as np
+
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is self._CLOSE:
+                return
+            batch = [item]
+            # Everything after the blocking get stays inside the try:
+            # any failure resolves the batch's futures with the
+            # exception instead of silently killing the lone worker.
+            try:
+                # Grab whatever is already pending without blocking; a
+                # solo click must not wait out the linger window.
+                while len(batch) < self._MAX_BATCH:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._CLOSE:
+                        closing = True
+                        break
+                    batch.append(item)
+                # A second pending row proves concurrent clicks; only
+                # then is lingering for stragglers worth the wait.
+                if len(batch) > 1 and not closing:
+                    deadline = time.monotonic() + self._LINGER
+                    while len(batch) < self._MAX_BATCH:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = self._queue.get(timeout=remaining)
+                        except queue.Empty:
+                            break
+                        if item is self._CLOSE:
+                            closing = True
+                            break
+                        batch.append(item)
+                out = self._predict_fn(np.vstack([row for _, row in batch]))
+            except Exception as exc:
+                for fut, _ in batch:
+                    fut.set_exception(exc)
+            else:
+                for i, (fut, _) in enumerate(batch):
+                    fut.set_result(out[i])
+
+
+@st.cache_resource
+def _bounds():
+    """Per-feature lower/upper bounds, in widget order.
+
+    Replaces the per-widget min_value/max_value machinery: the collected
+    row gets one vectorized ``np.clip`` pass instead of seven
+    Python-level clamps inside Streamlit's widget callbacks.
+    """
+    import numpy as np
+
+    lo = np.array(
+        [-np.inf, 0.0, 0.0, 800.0, 0.0, -20.0, 0.0], dtype=np.float32
+    )
+    hi = np.array(
+        [np.inf, 50.0, 24.0, 1100.0, 1500.0, 60.0, 100.0], dtype=np.float32
+    )
+    return lo, hi
+
+
+@st.cache_data(max_entries=128)
+def _fmt_vec(key: tuple) -> str:
+    """Pretty-print the raw input vector, cached per input tuple.
+
+    Repeat clicks with the same inputs reuse the formatted string
+    instead of re-running the repr.
+    """
+    return str(list(key))
+
+
+# Load eagerly: Streamlit reruns the script top-to-bottom, so populating
+# the cache_resource entry here (while the user is still filling in the
+# inputs) keeps the click itself down to pure predict time.
+try:
+    model = load_model()
+except FileNotFoundError as e:
+    st.error(str(e))
+    st.stop()
+
+
+@st.cache_resource
+def _batcher():
+    """One process-wide batching worker over the fastest predict path."""
+    m = load_model()
+    return _PredictBatcher(_numba_predict_fn(m) or _fast_predict_fn(m))
+
+
+predict_fn = _batcher().predict
+
+# Debug escape hatch against RAM creep on long-running deployments:
+# cache_resource keeps superseded model instances alive across
+# hot-reloads until explicitly dropped. The batcher must be cleared
+# too -- it closes over the model (or its tree/coef arrays), so
+# clearing load_model alone would reclaim nothing and leave predict_fn
+# serving the superseded instance on later reruns.
+with st.sidebar:
+    if st.button("🧹 Free memory"):
+        # Stop the worker first: its thread pins the predict closure
+        # (and through it the model) even after the caches are cleared.
+        _batcher().close()
+        _batcher.clear()
+        load_model.clear()
+        gc.collect()
+        st.rerun()
+
+
 # ---------- HERO SECTION ----------
+@st.cache_data
+def _hero_html() -> str:
+    """Static hero card, built once and reused across reruns."""
+    return """
+    <div class="glass-card">
+        <div class="hero-title">
+            AI Powered Adaptive<br/>Solar Energy Predictor
+        </div>
+        <p class="hero-subtitle">
+            Feed in real-time environmental parameters and let the model
+            estimate your <b>system production</b>.
+            Designed for smart grids, research projects, and next-gen
+            sustainable energy dashboards.
+        </p>
+    </div>
+    """
+
+
+@st.cache_data
+def _snapshot_html() -> str:
+    """Static Model Snapshot card, built once and reused across reruns."""
+    return """
+    <div class="glass-card">
+        <div class="section-title">Model Snapshot</div>
+        <p>⚙️ <b>Model:</b> system_production_model.pkl</p>
+        <p>🧠 <b>Engine:</b> Machine Learning regression</p>
+        <p>🔋 <b>Output:</b> Predicted Solar / System Production</p>
+        <p>🌐 <b>Use case:</b> AI-powered solar forecasting for your project</p>
+    </div>
+    """
+
+
 with st.container():
     left, right = st.columns([2, 1], gap="large")
 
     with left:
-        st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-        st.markdown(
-            """
-            <div class="hero-title">
-                AI Powered Adaptive<br/>Solar Energy Predictor
-            </div>
-            """,
-            unsafe_allow_html=True,
-        )
-        st.markdown(
-            """
-            <p class="hero-subtitle">
-                Feed in real-time environmental parameters and let the model
-                estimate your <b>system production</b>.
-                Designed for smart grids, research projects, and next-gen
-                sustainable energy dashboards.
-            </p>
-            """,
-            unsafe_allow_html=True,
-        )
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_hero_html(), unsafe_allow_html=True)
 
     with right:
-        st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-        st.markdown(
-            """
-            <div class="section-title">Model Snapshot</div>
-            """,
-            unsafe_allow_html=True,
-        )
-        st.write("⚙️ **Model:** system_production_model.pkl")
-        st.write("🧠 **Engine:** Machine Learning regression")
-        st.write("🔋 **Output:** Predicted Solar / System Production")
-        st.write("🌐 **Use case:** AI-powered solar forecasting for your project")
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_snapshot_html(), unsafe_allow_html=True)
 
 st.markdown("")  # spacing
 
@@ -171,8 +454,12 @@ with input_col:
     )
     st.caption("Enter the 7 input features below:")
 
+    # A form batches the widgets: edits to individual inputs no longer
+    # trigger a full script rerun -- only the submit button does.
+    form = st.form("inputs")
+
     # 1. Date-Hour (NMT) - numeric encoding as in your training
-    date_hour = st.number_input(
+    date_hour = form.number_input(
         "Date-Hour (NMT)",
         help="Numeric encoded Date-Hour used during training (for reference only).",
         format="%.2f",
@@ -180,63 +467,49 @@ with input_col:
     )
 
     # 2. Wind Speed (m/s)
-    wind_speed = st.number_input(
+    wind_speed = form.number_input(
         "Wind Speed (m/s)",
-        min_value=0.0,
-        max_value=50.0,
         value=3.5,
         step=0.1
     )
 
     # 3. Sunshine (hours)
-    sunshine = st.number_input(
+    sunshine = form.number_input(
         "Sunshine (hours)",
-        min_value=0.0,
-        max_value=24.0,
         value=6.0,
         step=0.1
     )
 
     # 4. Air Pressure (hPa)
-    air_pressure = st.number_input(
+    air_pressure = form.number_input(
         "Air Pressure (hPa)",
-        min_value=800.0,
-        max_value=1100.0,
         value=1013.0,
         step=0.5
     )
 
     # 5. Radiation (W/m²)
-    radiation = st.number_input(
+    radiation = form.number_input(
         "Radiation (W/m²)",
-        min_value=0.0,
-        max_value=1500.0,
         value=650.0,
         step=1.0
     )
 
     # 6. Air Temperature (°C)
-    air_temperature = st.number_input(
+    air_temperature = form.number_input(
         "Air Temperature (°C)",
-        min_value=-20.0,
-        max_value=60.0,
         value=28.0,
         step=0.1
     )
 
     # 7. Relative Air Humidity (%)
-    relative_humidity = st.number_input(
+    relative_humidity = form.number_input(
         "Relative Air Humidity (%)",
-        min_value=0.0,
-        max_value=100.0,
         value=45.0,
         step=0.5
     )
 
-    st.markdown("---")
-
     # Predict button
-    predict_clicked = st.button("⚡ Predict Solar Energy")
+    predict_clicked = form.form_submit_button("⚡ Predict Solar Energy")
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -250,35 +523,56 @@ with output_col:
 
     if predict_clicked:
         try:
-            model = load_model()
-            features = np.array(
-                [[
-                    date_hour,
-                    wind_speed,
-                    sunshine,
-                    air_pressure,
-                    radiation,
-                    air_temperature,
-                    relative_humidity
-                ]]
+            import numpy as np
+
+            key = (
+                date_hour,
+                wind_speed,
+                sunshine,
+                air_pressure,
+                radiation,
+                air_temperature,
+                relative_humidity,
             )
-            prediction = model.predict(features).item()
-
-            st.metric(
-                label="Predicted System / Solar Energy",
-                value=f"{prediction:,.2f}",
-                delta=None
-            )
-
-            st.success(
-                f"✅ Prediction generated successfully for Date-Hour (NMT): **{date_hour:.2f}**"
+            features = _feature_buffer()
+            # Tuple-to-row assignment fills all seven slots in one C-level
+            # copy instead of seven Python-level item stores.
+            features[0, :] = key
+            lo, hi = _bounds()
+            out_of_range = bool(((features[0] < lo) | (features[0] > hi)).any())
+            np.clip(features[0], lo, hi, out=features[0])
+            if out_of_range:
+                st.warning("⚠️ Some inputs were clamped to their valid range.")
+            # Re-clicking with unchanged inputs reuses the session's last
+            # prediction instead of re-running the model.
+            if st.session_state.get("last_key") == key:
+                prediction = st.session_state["last_pred"]
+            else:
+                prediction = float(predict_fn(features))
+                st.session_state["last_key"] = key
+                st.session_state["last_pred"] = prediction
+
+            # One st.markdown instead of metric + success + expander:
+            # the same content costs a single delta to the frontend and
+            # one DOM commit rather than four.
+            st.markdown(
+                f"""
+                <div class="glass-card">
+                    <div class="section-title">Predicted System / Solar Energy</div>
+                    <div class="hero-title" style="font-size:1.6rem">{prediction:,.2f}</div>
+                    <p style="color:#86efac">
+                        ✅ Prediction generated successfully for
+                        Date-Hour (NMT): <b>{date_hour:.2f}</b>
+                    </p>
+                    <details>
+                        <summary>View raw input vector</summary>
+                        <pre>{_fmt_vec(key)}</pre>
+                    </details>
+                </div>
+                """,
+                unsafe_allow_html=True,
             )
 
-            with st.expander("View raw input vector", expanded=False):
-                st.write(features)
-
-        except FileNotFoundError as e:
-            st.error(str(e))
         except Exception as e:
             st.error("🚨 An error occurred while generating prediction.")
             st.exception(e)
@@ -0,0 +1,35 @@
+"""One-off helper: export the pickled sklearn model to ONNX.
+
+Run this offline (needs skl2onnx) and commit the resulting
+``system_production_model.onnx`` next to ``app.py``; with onnxruntime
+installed in the deploy environment the app then serves predictions
+through it automatically. Both packages are optional extras -- like
+numba, they are deliberately not in requirements.txt, and the app falls
+back to the pickle when the ONNX file or onnxruntime is absent.
+
+Usage:
+    python export_onnx.py
+"""
+
+import joblib
+import numpy as np
+from skl2onnx import to_onnx
+
+MODEL_PKL = "system_production_model.pkl"
+MODEL_ONNX = "system_production_model.onnx"
+
+
+def main():
+    model = joblib.load(MODEL_PKL)
+    onx = to_onnx(
+        model,
+        np.zeros((1, 7), dtype=np.float32),
+        target_opset=17,
+    )
+    with open(MODEL_ONNX, "wb") as f:
+        f.write(onx.SerializeToString())
+    print(f"Wrote {MODEL_ONNX}")
+
+
+if __name__ == "__main__":
+    main()